@@ -64,3 +64,11 @@ def is_tree(graph):
         else:
             return False
     return len(visited) == len(graph)
+
+
+def is_forest(graph):
+    """
+    A graph is a forest if every connected component is a tree,
+    i.e. if the amount of edges equals the amount of vertices minus the amount of components.
+    """
+    return len(graph) - len(connected_components(graph)) == len(graph.edges)
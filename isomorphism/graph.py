@@ -1,4 +1,4 @@
-from debugging.utils import connected_components, time_this, is_tree
+from debugging.utils import connected_components, time_this, is_tree, is_forest
 import ast
 
 
@@ -19,6 +19,7 @@ class Graph(list):
         self._connected_components = None
         self._complete = None
         self._tree = None
+        self._forest = None
 
     def append(self, p_object):
         p_object.id = len(self)
@@ -62,6 +63,16 @@ class Graph(list):
 
         return self._tree
 
+    @property
+    def forest(self):
+        if self._forest is None:
+            if self._connected_components is None:
+                self._forest = is_forest(self)
+            else:
+                self._forest = len(self) - len(self._connected_components) == len(self.edges)
+
+        return self._forest
+
     def dot(self, name):
         path = '../output/{:s}.dot'.format(name)
         with open(path, 'w+') as file:
@@ -1,3 +1,5 @@
+from collections import Counter, deque
+from math import factorial
 from debugging.utils import time_this
 from isomorphism.graph import Graph, Vertex
 
@@ -30,21 +32,28 @@ def get_center(tree):
     """
     def find_furthest(start):
         """
-        Perform breadth-first search and mark the path.
+        Perform breadth-first search and store the parent of each visited vertex.
         """
-        p = None
-        visited, stack = set(), [[start]]
-        while stack:
-            p = stack.pop(0)
-            vertex = p[-1]
-            if vertex not in visited:
-                visited.add(vertex)
-                ext = vertex.nbs - visited
-                stack.extend([p + [v] for v in ext])
-        return p
-    n1 = tree[0]
-    n2 = find_furthest(n1)[-1]
-    path = find_furthest(n2)
+        vertex = start
+        parent = {start: None}
+        queue = deque([start])
+        while queue:
+            vertex = queue.popleft()
+            for v in vertex.nbs:
+                if v not in parent:
+                    parent[v] = vertex
+                    queue.append(v)
+        return vertex, parent
+
+    n1 = next(iter(tree))
+    n2, _ = find_furthest(n1)
+    n3, parent = find_furthest(n2)
+
+    # Walk back from the furthest vertex to reconstruct the longest path
+    path = []
+    while n3 is not None:
+        path.append(n3)
+        n3 = parent[n3]
 
     if not len(path) % 2:
         return path[len(path) // 2 - 1], path[len(path) // 2]
@@ -179,23 +188,13 @@ def tree_automorphisms(tree):
                 n += 1
                 prev, v.str = v.str, str(n)
 
-    # Use breadth-first search starting from the root vertex to count the number of isomorphic subtrees.
+    # Go through the levels starting from the root vertex to count the number of isomorphic subtrees.
     # Add the resulting counts to a list.
-    visited = set()
-    stack = [root]
     subtree_types = []
-    while stack:
-        cur = stack.pop(0)
-        children = [v.str for v in cur.nbs if v.label > cur.label]
-        subtree_types += map(lambda x: children.count(x), set(children))
-        visited.add(cur)
-        stack.extend(cur.nbs - visited)
-
-    def factorial(n):
-        if n == 0:
-            return 1
-        else:
-            return n * factorial(n-1)
+    for level in levels.values():
+        for cur in level:
+            children = [v.str for v in cur.nbs if v.label > cur.label]
+            subtree_types += map(lambda x: children.count(x), set(children))
 
     # Multiply the factorial of each isomorphic subtree count.
     # The result is the amount of automorphisms of this tree.
@@ -205,6 +204,84 @@ def tree_automorphisms(tree):
 
     return count
 
+
+def canonise(tree, canon):
+    """
+    Compute the canonical form of a tree without modifying it, together with its number of automorphisms.
+    Every rooted subtree gets a label from the canon dict, shared by all trees that are compared with each other,
+    so rooted subtrees with the same label are isomorphic, also if they belong to different trees.
+    If the tree has two centers, both halves are treated as children of a virtual root.
+    """
+    center = get_center(tree)
+
+    # Breadth-first search from the center(s), keeping the order so the tree can be labeled bottom-up
+    parent = {c: None for c in center}
+    order = list(center)
+    for cur in order:
+        for v in cur.nbs:
+            if v not in parent:
+                parent[v] = cur
+                order.append(v)
+
+    children = {v: [] for v in order}
+    for v in order:
+        if parent[v] is not None:
+            children[parent[v]].append(v)
+
+    # From bottom to top, label each vertex by the sorted labels of its children
+    # and multiply the count by the factorial of the amount of isomorphic children
+    labels = {}
+    count = 1
+    for v in reversed(order):
+        child_labels = tuple(sorted(labels[c] for c in children[v]))
+        labels[v] = canon.setdefault(child_labels, len(canon))
+        for m in Counter(child_labels).values():
+            count *= factorial(m)
+
+    # Two isomorphic halves can be swapped at the virtual root
+    form = tuple(sorted(labels[c] for c in center))
+    if len(form) == 2 and form[0] == form[1]:
+        count *= 2
+
+    return form, count
+
+
+@time_this
+def forest_isomorphism(f1, f2):
+    """
+    Canonise each component tree of both forests.
+    The forests are isomorphic if they contain the same canonical forms with the same multiplicities.
+    """
+    if len(f1) != len(f2) or len(f1.edges) != len(f2.edges):
+        return False
+
+    canon = {}
+    forms_f1 = Counter(canonise(c, canon)[0] for c in f1.connected_components)
+    forms_f2 = Counter(canonise(c, canon)[0] for c in f2.connected_components)
+
+    return forms_f1 == forms_f2
+
+
+@time_this
+def forest_automorphisms(forest):
+    """
+    Canonise each component tree of the forest and count its automorphisms.
+    The number of automorphisms of the forest is the product of those of its components,
+    times the factorial of the multiplicity of each canonical form (isomorphic components can be permuted).
+    """
+    canon = {}
+    forms = Counter()
+    count = 1
+    for c in forest.connected_components:
+        form, automorphisms = canonise(c, canon)
+        forms[form] += 1
+        count *= automorphisms
+
+    for m in forms.values():
+        count *= factorial(m)
+
+    return count
+
 if __name__ == '__main__':
     # graphs = Graph.read_graph('C:\\Development\\PycharmProjects\\GraphIsomorphism\\graphs\\bigtrees3.grl')
     # t = Graph.read_graph('C:\\Development\\PycharmProjects\\GraphIsomorphism\\graphs\\bonusAut2.gr')[0]